@@ -0,0 +1,105 @@
+"""Сравнение построчного и векторизованного SELECT ... WHERE.
+
+Замеряется core.select целиком: чтение таблицы с диска и фильтрация.
+Запуск из корня проекта:
+    python -m benchmarks.scan_benchmark --rows 10000000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from src.primitive_db import core, vectorized
+from src.primitive_db.cache import result_cache
+from src.primitive_db.catalog import Catalog
+from src.primitive_db.utils import columns_dir, save_table_data
+
+TABLE_NAME = "bench"
+# Условия выбирают немного записей, чтобы замер не зависел от вывода
+WHERE_CLAUSES = [
+    {'column': 'score', 'operator': '>', 'value': 99990},
+    {'column': 'city', 'operator': '=', 'value': 'city_7'},
+    {'column': 'vip', 'operator': '=', 'value': True},
+]
+
+
+def generate_rows(count):
+    """Генерирует записи тестовой таблицы"""
+    rng = random.Random(42)
+    return [
+        {
+            'ID': i,
+            'score': rng.randrange(100000),
+            'vip': rng.random() < 0.0001,
+            'city': f"city_{rng.randrange(100000)}",
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def measure_select(catalog, where_clause):
+    """Выполняет core.select без кэша результатов и возвращает время"""
+    result_cache.invalidate(TABLE_NAME)
+    start_time = time.monotonic()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = core.select(catalog, TABLE_NAME, where_clause)
+    return result, time.monotonic() - start_time
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--rows", type=int, default=10_000_000)
+    args = arg_parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    start_dir = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        catalog = Catalog()
+        catalog.create(TABLE_NAME, ["ID:int", "score:int", "vip:bool", "city:str"])
+        print(f"Генерация {args.rows} записей...")
+        save_table_data(TABLE_NAME, generate_rows(args.rows))
+
+        numpy_available = vectorized.NUMPY_AVAILABLE
+        if not numpy_available:
+            print("NumPy не установлен, замеряется только построчный проход.")
+
+        for where_clause in WHERE_CLAUSES:
+            condition = (
+                f"{where_clause['column']} {where_clause['operator']} "
+                f"{where_clause['value']}"
+            )
+            vectorized.NUMPY_AVAILABLE = False
+            expected, python_time = measure_select(catalog, where_clause)
+            vectorized.NUMPY_AVAILABLE = numpy_available
+            print(f"\n{condition}: найдено {len(expected)}")
+            print(f"  построчно:                  {python_time:.3f} с")
+            if not numpy_available:
+                continue
+
+            # Первый запрос строит колоночное хранилище из JSON-файла,
+            # следующие читают его с диска через mmap
+            shutil.rmtree(columns_dir(TABLE_NAME), ignore_errors=True)
+            cold, cold_time = measure_select(catalog, where_clause)
+            warm, warm_time = measure_select(catalog, where_clause)
+            assert cold == expected and warm == expected
+            print(
+                f"  NumPy, построение хранилища: {cold_time:.3f} с "
+                f"(x{python_time / cold_time:.1f})"
+            )
+            print(
+                f"  NumPy, готовое хранилище:    {warm_time:.3f} с "
+                f"(x{python_time / warm_time:.1f})"
+            )
+    finally:
+        os.chdir(start_dir)
+        shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Кэш результатов SELECT с инвалидацией по таблицам"""
+
+import sys
+import threading
+from collections import OrderedDict
+
+from .constants import CACHE_MAX_BYTES, CACHE_MAX_ENTRIES, SIZE_SAMPLE
+
+
+def make_key(table_name, where_clause, projection, order=None, limit=None):
+    """Строит нормализованный ключ запроса"""
+    predicate = None
+    if where_clause:
+        value = where_clause['value']
+        # Тип значения входит в ключ: True и 1 сравниваются по-разному
+        predicate = (
+            where_clause['column'],
+            where_clause['operator'],
+            type(value).__name__,
+            value,
+        )
+    return (table_name, predicate, tuple(projection), order, limit)
+
+
+def estimate_size(rows, sample_size=SIZE_SAMPLE):
+    """Приблизительно оценивает объем памяти, занятый записями.
+
+    Размер считается по равномерной выборке записей и умножается на
+    их число, поэтому оценка не зависит от размера результата.
+    """
+    size = sys.getsizeof(rows)
+    if not rows:
+        return size
+
+    step = max(1, len(rows) // sample_size)
+    sample = rows[::step][:sample_size]
+    sample_bytes = 0
+    for record in sample:
+        sample_bytes += sys.getsizeof(record)
+        for value in record.values():
+            sample_bytes += sys.getsizeof(value)
+    return size + sample_bytes * len(rows) // len(sample)
+
+
+class ResultCache:
+    """LRU-кэш результатов с ограничением по числу записей и памяти.
+
+    Каждая таблица имеет счетчик версий; ключ записи включает версию,
+    поэтому изменение таблицы делает недействительными только ее
+    результаты.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def version(self, table_name):
+        return self._versions.get(table_name, 0)
+
+    def get(self, key):
+        """Возвращает результат или None, если его нет в кэше"""
+        table_name = key[0]
+        with self._lock:
+            entry = self._entries.get((self.version(table_name), key))
+            if entry is None:
+                return None
+            self._entries.move_to_end((self.version(table_name), key))
+            return entry[0]
+
+    def put(self, key, rows):
+        """Запоминает результат, вытесняя давно не использованные"""
+        size = estimate_size(rows)
+        if size > self.max_bytes:
+            return
+
+        table_name = key[0]
+        with self._lock:
+            versioned_key = (self.version(table_name), key)
+            old_entry = self._entries.pop(versioned_key, None)
+            if old_entry is not None:
+                self.total_bytes -= old_entry[1]
+
+            self._entries[versioned_key] = (rows, size)
+            self.total_bytes += size
+            while (len(self._entries) > self.max_entries
+                    or self.total_bytes > self.max_bytes):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+
+    def invalidate(self, table_name):
+        """Делает недействительными результаты одной таблицы"""
+        with self._lock:
+            self._versions[table_name] = self.version(table_name) + 1
+            # Устаревшие записи больше не найдутся, освобождаем память сразу
+            stale_keys = [
+                versioned_key for versioned_key in self._entries
+                if versioned_key[1][0] == table_name
+            ]
+            for versioned_key in stale_keys:
+                _, size = self._entries.pop(versioned_key)
+                self.total_bytes -= size
+
+
+result_cache = ResultCache()
@@ -0,0 +1,230 @@
+"""Каталог метаданных: схема каждой таблицы хранится в отдельном файле"""
+
+import json
+import os
+import shutil
+
+from .constants import META_DIR, META_FILE, VALID_TYPES
+from .parser import validate_value_type
+from .utils import load_metadata
+
+
+class Column:
+    """Столбец таблицы: имя, тип, позиция и валидатор значений"""
+
+    def __init__(self, name, col_type, position, default=None):
+        self.name = name
+        self.type = col_type
+        self.position = position
+        self.default = default
+
+    def validate(self, value):
+        """Приводит значение к типу столбца"""
+        return validate_value_type(value, self.type)
+
+    def to_dict(self):
+        data = {'name': self.name, 'type': self.type}
+        if self.default is not None:
+            data['default'] = self.default
+        return data
+
+    def __str__(self):
+        return f"{self.name}:{self.type}"
+
+
+def parse_column(spec, position):
+    """Разбирает строку вида 'имя:тип' в объект Column"""
+    col_parts = spec.split(":")
+    if len(col_parts) != 2:
+        raise ValueError(
+            f'Некорректный формат столбца "{spec}". Используйте: имя:тип'
+        )
+
+    col_name, col_type = col_parts
+    if col_type not in VALID_TYPES:
+        raise ValueError(
+            f'Неподдерживаемый тип данных "{col_type}" '
+            f'в столбце "{col_name}".'
+        )
+    return Column(col_name, col_type, position)
+
+
+class TableSchema:
+    """Схема таблицы, разобранная один раз при загрузке"""
+
+    def __init__(self, name, columns, dropped=None):
+        self.name = name
+        self.columns = list(columns)
+        # Удаленные столбцы, значения которых еще лежат в файле данных
+        self.dropped = list(dropped or [])
+        self._reindex()
+
+    def _reindex(self):
+        for position, col in enumerate(self.columns):
+            col.position = position
+        self._by_name = {col.name: col for col in self.columns}
+
+    @property
+    def column_names(self):
+        return [col.name for col in self.columns]
+
+    def column(self, name):
+        """Возвращает столбец по имени или None"""
+        return self._by_name.get(name)
+
+    def add_column(self, column):
+        """Добавляет столбец в конец схемы без перезаписи данных"""
+        if column.name in self._by_name:
+            raise ValueError(f'Столбец "{column.name}" уже существует.')
+        if column.name in self.dropped:
+            raise ValueError(
+                f'Столбец "{column.name}" удален, но его данные еще не '
+                'освобождены. Повторите после перезаписи таблицы.'
+            )
+        self.columns.append(column)
+        self._reindex()
+
+    def drop_column(self, name):
+        """Убирает столбец из схемы; данные освобождаются позже"""
+        if name == "ID":
+            raise ValueError('Столбец "ID" удалить нельзя.')
+        if name not in self._by_name:
+            raise KeyError(name)
+        self.columns = [col for col in self.columns if col.name != name]
+        self.dropped.append(name)
+        self._reindex()
+
+    def materialize(self, record):
+        """Дополняет запись значениями по умолчанию и скрывает удаленные"""
+        for name in self.dropped:
+            record.pop(name, None)
+        for col in self.columns:
+            if col.default is not None and col.name not in record:
+                record[col.name] = col.default
+        return record
+
+    def to_dict(self):
+        data = {
+            'name': self.name,
+            'columns': [col.to_dict() for col in self.columns],
+        }
+        if self.dropped:
+            data['dropped'] = self.dropped
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        columns = [
+            Column(col['name'], col['type'], position, col.get('default'))
+            for position, col in enumerate(data['columns'])
+        ]
+        return cls(data['name'], columns, data.get('dropped'))
+
+    def __str__(self):
+        return ", ".join(str(col) for col in self.columns)
+
+
+def _write_schema(path, schema):
+    """Атомарно записывает файл схемы"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(schema.to_dict(), f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+class Catalog:
+    """Ленивый каталог схем: файл схемы читается при первом обращении"""
+
+    def __init__(self, meta_dir=META_DIR, legacy_file=META_FILE):
+        self.meta_dir = meta_dir
+        self._schemas = {}
+        if not os.path.exists(meta_dir):
+            self._migrate_legacy(legacy_file)
+
+    def _path(self, table_name):
+        return os.path.join(self.meta_dir, f"{table_name}.json")
+
+    def _migrate_legacy(self, legacy_file):
+        """Переносит схемы из общего db_meta.json в отдельные файлы.
+
+        Схемы пишутся во временную директорию, которая получает имя
+        meta_dir только после переноса всех таблиц: прерванный перенос
+        повторяется при следующем запуске целиком.
+        """
+        try:
+            legacy = load_metadata(legacy_file)
+        except ValueError as e:
+            # Каталог остается пустым, перенос повторится при следующем запуске
+            print(f"Ошибка: Не удалось прочитать {legacy_file}: {e}")
+            return
+
+        tmp_dir = f"{self.meta_dir}.migrating"
+        if os.path.exists(tmp_dir):
+            shutil.rmtree(tmp_dir)
+        os.makedirs(tmp_dir)
+
+        for table_name, specs in legacy.items():
+            try:
+                columns = [
+                    parse_column(spec, position)
+                    for position, spec in enumerate(specs)
+                ]
+            except (ValueError, TypeError, AttributeError) as e:
+                print(
+                    f'Ошибка: Схема таблицы "{table_name}" из {legacy_file} '
+                    f'не перенесена: {e}'
+                )
+                continue
+            schema = TableSchema(table_name, columns)
+            _write_schema(os.path.join(tmp_dir, f"{table_name}.json"), schema)
+
+        os.rename(tmp_dir, self.meta_dir)
+
+    def __contains__(self, table_name):
+        if table_name in self._schemas:
+            return True
+        return os.path.exists(self._path(table_name))
+
+    def __getitem__(self, table_name):
+        schema = self._schemas.get(table_name)
+        if schema is None:
+            try:
+                with open(self._path(table_name), 'r', encoding='utf-8') as f:
+                    schema = TableSchema.from_dict(json.load(f))
+            except FileNotFoundError:
+                raise KeyError(table_name) from None
+            self._schemas[table_name] = schema
+        return schema
+
+    def __iter__(self):
+        if not os.path.exists(self.meta_dir):
+            return iter([])
+        names = [
+            filename[:-len(".json")]
+            for filename in os.listdir(self.meta_dir)
+            if filename.endswith(".json")
+        ]
+        return iter(sorted(names))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def create(self, table_name, specs):
+        """Создает схему таблицы и записывает только ее файл"""
+        columns = [
+            parse_column(spec, position) for position, spec in enumerate(specs)
+        ]
+        schema = TableSchema(table_name, columns)
+        self.save(schema)
+        return schema
+
+    def save(self, schema):
+        """Атомарно записывает файл схемы одной таблицы"""
+        os.makedirs(self.meta_dir, exist_ok=True)
+        _write_schema(self._path(schema.name), schema)
+        self._schemas[schema.name] = schema
+
+    def drop(self, table_name):
+        """Удаляет файл схемы таблицы"""
+        self._schemas.pop(table_name, None)
+        os.remove(self._path(table_name))
@@ -0,0 +1,151 @@
+"""Сжатие таблиц: вычищает удаленные записи и столбцы вне основного потока"""
+
+import json
+import os
+import threading
+
+from .constants import COMPACTION_INTERVAL, COMPACTION_THRESHOLD, DATA_DIR
+from .utils import (
+    ensure_data_dir,
+    list_tombstoned_tables,
+    load_garbage_stats,
+    load_table_data,
+    load_tombstones,
+    save_tombstones,
+    swap_table_data,
+    table_generation,
+    table_lock,
+)
+
+
+def garbage_ratio(schema):
+    """Оценивает долю мусора в файле данных таблицы"""
+    row_count, tombstone_count = load_garbage_stats(schema.name)
+    tombstone_ratio = tombstone_count / row_count if row_count else 0.0
+    dropped_ratio = len(schema.dropped) / (
+        len(schema.dropped) + len(schema.columns)
+    )
+    return max(tombstone_ratio, dropped_ratio)
+
+
+def compact_table(catalog, table_name):
+    """Переписывает таблицу без мусора и подменяет файл данных.
+
+    Возвращает число вычищенных записей или None, если таблица
+    изменилась во время сжатия и подмена отменена.
+    """
+    with table_lock(table_name):
+        generation = table_generation(table_name)
+        tombstones = load_tombstones(table_name)
+        dropped = list(catalog[table_name].dropped)
+
+    # Файл читается и переписывается без блокировки, основной поток не
+    # ждет; если за это время таблицу перезаписали, подмена отменится
+    rows = load_table_data(table_name)
+    compacted = []
+    for record in rows:
+        if record.get('ID') in tombstones:
+            continue
+        for name in dropped:
+            record.pop(name, None)
+        compacted.append(record)
+
+    ensure_data_dir()
+    tmp_path = f"{DATA_DIR}/{table_name}.json.compact"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(compacted, f, ensure_ascii=False, indent=2)
+
+    with table_lock(table_name):
+        if (table_generation(table_name) != generation
+                or table_name not in catalog):
+            os.remove(tmp_path)
+            return None
+
+        swap_table_data(table_name, tmp_path)
+        # Метки и столбцы, удаленные во время сжатия, остаются до следующего
+        save_tombstones(
+            table_name,
+            load_tombstones(table_name) - tombstones,
+            len(compacted),
+        )
+        if dropped:
+            # Схему могли изменить, пока файл переписывался без блокировки
+            schema = catalog[table_name]
+            schema.dropped = [
+                name for name in schema.dropped if name not in dropped
+            ]
+            catalog.save(schema)
+
+    return len(rows) - len(compacted)
+
+
+class CompactionScheduler:
+    """Фоновый поток, сжимающий таблицы с долей мусора выше порога"""
+
+    def __init__(self, catalog, threshold=COMPACTION_THRESHOLD,
+                 interval=COMPACTION_INTERVAL):
+        self.catalog = catalog
+        self.threshold = threshold
+        self.interval = interval
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(
+            target=self._run, name="compaction", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        """Останавливает поток после текущего прохода"""
+        self._stopped = True
+        self._wakeup.set()
+        self._thread.join()
+
+    def notify(self, table_name):
+        """Отмечает таблицу как кандидата на сжатие"""
+        with self._lock:
+            self._pending.add(table_name)
+
+    def _collect_pending(self):
+        """Находит таблицы с мусором, оставшимся от прошлых сеансов"""
+        for table_name in list_tombstoned_tables():
+            self.notify(table_name)
+        for table_name in self.catalog:
+            if self.catalog[table_name].dropped:
+                self.notify(table_name)
+
+    def _run(self):
+        # Каталог просматривается уже в фоновом потоке, чтобы не
+        # задерживать запуск
+        try:
+            self._collect_pending()
+        except Exception:
+            pass
+
+        while not self._stopped:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            with self._lock:
+                pending, self._pending = self._pending, set()
+
+            for table_name in pending:
+                if self._stopped:
+                    break
+                try:
+                    self._maybe_compact(table_name)
+                except Exception:
+                    # Ошибки фонового сжатия не должны мешать работе;
+                    # таблица будет проверена на следующем проходе
+                    self.notify(table_name)
+
+    def _maybe_compact(self, table_name):
+        if table_name not in self.catalog:
+            return
+        if garbage_ratio(self.catalog[table_name]) < self.threshold:
+            return
+        if compact_table(self.catalog, table_name) is None:
+            # Таблицу изменили во время сжатия, повторим на следующем проходе
+            self.notify(table_name)
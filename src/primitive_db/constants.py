@@ -1,5 +1,17 @@
 """Константы проекта."""
 
 META_FILE = "db_meta.json"
+META_DIR = "meta"
 DATA_DIR = "data"
 VALID_TYPES = {"int", "str", "bool"}
+
+# Доля мусора в таблице, при которой запускается фоновое сжатие
+COMPACTION_THRESHOLD = 0.3
+# Период проверки таблиц фоновым потоком сжатия, в секундах
+COMPACTION_INTERVAL = 5.0
+
+# Ограничения кэша результатов SELECT
+CACHE_MAX_ENTRIES = 128
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Число записей, по которым оценивается объем результата или таблицы
+SIZE_SAMPLE = 1000
@@ -2,88 +2,151 @@
 
 from prettytable import PrettyTable
 
-from .constants import VALID_TYPES
-from .decorators import clear_cache, confirm_action, handle_db_errors, log_time
-from .parser import validate_value_type
-from .utils import load_table_data, save_table_data
+from .cache import make_key, result_cache
+from .catalog import parse_column
+from .compaction import compact_table
+from .decorators import confirm_action, handle_db_errors, log_time
+from .utils import (
+    load_table_data,
+    load_tombstones,
+    remove_table_data,
+    save_table_data,
+    save_tombstones,
+    table_lock,
+)
+from .vectorized import select_rows
+
+
+def _load_rows(schema):
+    """Загружает живые записи таблицы в представлении текущей схемы"""
+    tombstones = load_tombstones(schema.name)
+    return [
+        schema.materialize(record)
+        for record in load_table_data(schema.name)
+        if record.get('ID') not in tombstones
+    ]
+
+
+def _save_rows(catalog, schema, rows):
+    """Сохраняет записи; перезапись освобождает удаленные записи и столбцы"""
+    with table_lock(schema.name):
+        save_table_data(schema.name, rows)
+        save_tombstones(schema.name, set())
+        if schema.dropped:
+            schema.dropped = []
+            catalog.save(schema)
 
 
 @handle_db_errors
-def create_table(metadata, table_name, columns):
+def create_table(catalog, table_name, columns):
     """Создает новую таблицу"""
-    if table_name in metadata:
+    if table_name in catalog:
         print(f'Ошибка: Таблица "{table_name}" уже существует.')
-        return metadata
+        return catalog
     
-    # Очищаем кэш при создании таблицы
-    clear_cache()
+    # Сбрасываем кэш результатов только для этой таблицы
+    result_cache.invalidate(table_name)
     
     # Добавляем ID столбец автоматически
     table_columns = ["ID:int"]
     table_columns.extend(columns)
     
-    # Проверяем типы данных
-    for col in table_columns:
-        col_parts = col.split(":")
-        if len(col_parts) != 2:
-            print(
-                f'Ошибка: Некорректный формат столбца "{col}". '
-                'Используйте: имя:тип'
-            )
-            return metadata
-        
-        col_name, col_type = col_parts
-        if col_type not in VALID_TYPES:
-            print(
-                f'Ошибка: Неподдерживаемый тип данных "{col_type}" '
-                f'в столбце "{col_name}".'
-            )
-            return metadata
+    # Проверяем типы данных и записываем схему в отдельный файл
+    try:
+        with table_lock(table_name):
+            schema = catalog.create(table_name, table_columns)
+    except ValueError as e:
+        print(f"Ошибка: {e}")
+        return catalog
     
-    metadata[table_name] = table_columns
-    columns_str = ", ".join(table_columns)
-    print(f'Таблица "{table_name}" успешно создана со столбцами: {columns_str}')
-    return metadata
+    print(f'Таблица "{table_name}" успешно создана со столбцами: {schema}')
+    return catalog
 
 
 @handle_db_errors
 @confirm_action("удаление таблицы")
-def drop_table(metadata, table_name):
+def drop_table(catalog, table_name):
     """Удаляет таблицу"""
-    if table_name not in metadata:
+    if table_name not in catalog:
         print(f'Ошибка: Таблица "{table_name}" не существует.')
-        return metadata
+        return catalog
     
-    clear_cache()
+    result_cache.invalidate(table_name)
     
-    del metadata[table_name]
+    # Данные удаляются вместе со схемой, иначе невычищенные записи
+    # и столбцы вернутся в таблицу с тем же именем
+    with table_lock(table_name):
+        catalog.drop(table_name)
+        remove_table_data(table_name)
     print(f'Таблица "{table_name}" успешно удалена.')
-    return metadata
+    return catalog
+
+
+@handle_db_errors
+def add_column(catalog, table_name, column_spec, default=None):
+    """Добавляет столбец без перезаписи данных таблицы"""
+    if table_name not in catalog:
+        raise KeyError(f'Таблица "{table_name}" не существует.')
+    
+    column = parse_column(column_spec, 0)
+    if default is not None:
+        column.default = column.validate(default)
+    
+    # Изменяется только файл схемы: отсутствующее значение в старых
+    # записях подставляется при чтении. Блокировка не дает фоновому
+    # сжатию одновременно менять ту же схему
+    with table_lock(table_name):
+        schema = catalog[table_name]
+        schema.add_column(column)
+        catalog.save(schema)
+    result_cache.invalidate(table_name)
+    print(f'Столбец "{column}" добавлен в таблицу "{table_name}".')
+    return schema
+
+
+@handle_db_errors
+@confirm_action("удаление столбца")
+def drop_column(catalog, table_name, column_name):
+    """Удаляет столбец из схемы без перезаписи данных таблицы"""
+    if table_name not in catalog:
+        raise KeyError(f'Таблица "{table_name}" не существует.')
+    
+    # Значения столбца скрываются при чтении и исчезают из файла
+    # при следующей его перезаписи
+    with table_lock(table_name):
+        schema = catalog[table_name]
+        schema.drop_column(column_name)
+        catalog.save(schema)
+    result_cache.invalidate(table_name)
+    print(f'Столбец "{column_name}" удален из таблицы "{table_name}".')
+    return schema
 
 
 @handle_db_errors
-def list_tables(metadata):
+def list_tables(catalog):
     """Выводит список всех таблиц"""
-    if not metadata:
+    table_names = list(catalog)
+    if not table_names:
         print("Нет созданных таблиц.")
         return
     
     print("Список таблиц:")
-    for table_name in metadata:
+    for table_name in table_names:
         print(f"- {table_name}")
 
 
 @handle_db_errors
 @log_time
-def insert(metadata, table_name, values):
+def insert(catalog, table_name, values):
     """Добавляет запись в таблицу"""
-    if table_name not in metadata:
+    if table_name not in catalog:
         raise KeyError(f'Таблица "{table_name}" не существует.')
     
-    clear_cache()
+    result_cache.invalidate(table_name)
     
-    table_data = load_table_data(table_name)
-    columns = metadata[table_name]
+    schema = catalog[table_name]
+    table_data = _load_rows(schema)
+    columns = schema.columns
     
     # Проверяем количество значений (без ID)
     expected_count = len(columns) - 1
@@ -99,44 +162,55 @@ def insert(metadata, table_name, values):
     
     # Создаем запись
     record = {'ID': new_id}
-    for i, col in enumerate(columns[1:]):  # Пропускаем ID
-        col_name, col_type = col.split(":")
-        record[col_name] = validate_value_type(values[i], col_type)
+    for value, column in zip(values, columns[1:]):  # Пропускаем ID
+        record[column.name] = column.validate(value)
     
     table_data.append(record)
-    save_table_data(table_name, table_data)
+    _save_rows(catalog, schema, table_data)
     print(f'Запись с ID={new_id} успешно добавлена в таблицу "{table_name}".')
     return table_data
 
 
 @handle_db_errors
 @log_time
-#@simple_cache
-def select(metadata, table_name, where_clause=None):
+def select(catalog, table_name, where_clause=None):
     """Выбирает записи из таблицы."""
-    if table_name not in metadata:
+    if table_name not in catalog:
         raise KeyError(f'Таблица "{table_name}" не существует.')
     
-    table_data = load_table_data(table_name)
+    columns = catalog[table_name].column_names
+    cache_key = make_key(table_name, where_clause, columns)
+    result_data = result_cache.get(cache_key)
     
-    if not table_data:
-        print(f'Таблица "{table_name}" пуста.')
-        return []
+    if result_data is not None:
+        print("(результат из кэша)")
+    elif where_clause:
+        # С NumPy условие вычисляется по колоночному хранилищу, и
+        # записи собираются только для подходящих строк
+        result_data = select_rows(catalog[table_name], where_clause)
     
-    # Фильтруем записи если задано условие
-    if where_clause:
-        from .parser import apply_where_condition
-        filtered_data = []
-        for record in table_data:
-            if apply_where_condition(record, where_clause):
-                filtered_data.append(record)
-        result_data = filtered_data
-    else:
-        result_data = table_data
+    if result_data is None:
+        table_data = _load_rows(catalog[table_name])
+        
+        if not table_data:
+            print(f'Таблица "{table_name}" пуста.')
+            return []
+        
+        # Фильтруем записи если задано условие
+        if where_clause:
+            from .parser import apply_where_condition
+            filtered_data = []
+            for record in table_data:
+                if apply_where_condition(record, where_clause):
+                    filtered_data.append(record)
+            result_data = filtered_data
+        else:
+            result_data = table_data
+        
+        result_cache.put(cache_key, result_data)
     
     # Выводим результат в виде таблицы
     if result_data:
-        columns = [col.split(":")[0] for col in metadata[table_name]]
         table = PrettyTable()
         table.field_names = columns
         
@@ -152,17 +226,15 @@ def select(metadata, table_name, where_clause=None):
 
 
 @handle_db_errors
-def update(metadata, table_name, set_clause, where_clause):
+def update(catalog, table_name, set_clause, where_clause):
     """Обновляет записи в таблице."""
-    if table_name not in metadata:
+    if table_name not in catalog:
         raise KeyError(f'Таблица "{table_name}" не существует.')
     
-    clear_cache()
+    result_cache.invalidate(table_name)
     
-    table_data = load_table_data(table_name)
-    columns_dict = {
-        col.split(":")[0]: col.split(":")[1] for col in metadata[table_name]
-    }
+    schema = catalog[table_name]
+    table_data = _load_rows(schema)
     
     updated_count = 0
     for record in table_data:
@@ -176,12 +248,13 @@ def update(metadata, table_name, set_clause, where_clause):
         if match:
             # Обновляем поля согласно SET
             for col, new_value in set_clause.items():
-                if col in columns_dict:
-                    record[col] = validate_value_type(new_value, columns_dict[col])
+                column = schema.column(col)
+                if column is not None:
+                    record[col] = column.validate(new_value)
                     updated_count += 1
     
     if updated_count > 0:
-        save_table_data(table_name, table_data)
+        _save_rows(catalog, schema, table_data)
         print(f'Успешно обновлено {updated_count} записей в таблице "{table_name}".')
     else:
         print("Записи для обновления не найдены.")
@@ -191,18 +264,18 @@ def update(metadata, table_name, set_clause, where_clause):
 
 @handle_db_errors
 @confirm_action("удаление записей")
-def delete(metadata, table_name, where_clause):
+def delete(catalog, table_name, where_clause):
     """Удаляет записи из таблицы."""
-    if table_name not in metadata:
+    if table_name not in catalog:
         raise KeyError(f'Таблица "{table_name}" не существует.')
     
-    clear_cache()
+    result_cache.invalidate(table_name)
     
-    table_data = load_table_data(table_name)
+    table_data = _load_rows(catalog[table_name])
     
     # Фильтруем записи которые НЕ должны быть удалены
     filtered_data = []
-    deleted_count = 0
+    deleted_ids = set()
     
     for record in table_data:
         match = True
@@ -212,14 +285,20 @@ def delete(metadata, table_name, where_clause):
                 match = False
         
         if match:
-            deleted_count += 1
+            deleted_ids.add(record['ID'])
         else:
             filtered_data.append(record)
     
-    if deleted_count > 0:
-        save_table_data(table_name, filtered_data)
+    if deleted_ids:
+        # Записи только помечаются удаленными, файл данных перепишет
+        # фоновое сжатие или команда vacuum
+        with table_lock(table_name):
+            tombstones = load_tombstones(table_name)
+            # В файле лежат и живые записи, и ранее удаленные
+            row_count = len(table_data) + len(tombstones)
+            save_tombstones(table_name, tombstones | deleted_ids, row_count)
         print(
-            f'Успешно удалено {deleted_count} записей из таблицы "{table_name}".'
+            f'Успешно удалено {len(deleted_ids)} записей из таблицы "{table_name}".'
         )
     else:
         print("Записи для удаления не найдены.")
@@ -228,13 +307,32 @@ def delete(metadata, table_name, where_clause):
 
 
 @handle_db_errors
-def info(metadata, table_name):
+def info(catalog, table_name):
     """Выводит информацию о таблице"""
-    if table_name not in metadata:
+    if table_name not in catalog:
         raise KeyError(f'Таблица "{table_name}" не существует.')
     
-    table_data = load_table_data(table_name)
+    table_data = _load_rows(catalog[table_name])
+    tombstones = load_tombstones(table_name)
     
     print(f'Таблица: {table_name}')
-    print(f'Столбцы: {", ".join(metadata[table_name])}')
-    print(f'Количество записей: {len(table_data)}')
\ No newline at end of file
+    print(f'Столбцы: {catalog[table_name]}')
+    print(f'Количество записей: {len(table_data)}')
+    if tombstones:
+        print(f'Удаленных записей до сжатия: {len(tombstones)}')
+
+
+@handle_db_errors
+@log_time
+def vacuum(catalog, table_name):
+    """Принудительно сжимает таблицу"""
+    if table_name not in catalog:
+        raise KeyError(f'Таблица "{table_name}" не существует.')
+    
+    removed_count = compact_table(catalog, table_name)
+    if removed_count is None:
+        print(f'Таблица "{table_name}" изменилась во время сжатия, повторите.')
+    else:
+        print(
+            f'Таблица "{table_name}" сжата, вычищено записей: {removed_count}.'
+        )
\ No newline at end of file
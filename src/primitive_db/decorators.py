@@ -51,27 +51,3 @@ def log_time(func):
         return result
     return wrapper
 
-
-# Простое кэширование для демонстрации
-_simple_cache = {}
-
-
-def simple_cache(func):
-    """Простой декоратор для кэширования"""
-    def wrapper(*args, **kwargs):
-        cache_key = f"{func.__name__}_{str(args)}_{str(kwargs)}"
-        if cache_key in _simple_cache:
-            print("(результат из кэша)")
-            return _simple_cache[cache_key]
-        else:
-            result = func(*args, **kwargs)
-            _simple_cache[cache_key] = result
-            return result
-    return wrapper
-    
-    
-def clear_cache():
-    """Очищает кэш"""
-    global _simple_cache
-    _simple_cache = {}
-    print("Кэш очищен.")
\ No newline at end of file
@@ -4,18 +4,27 @@ import shlex
 
 import prompt
 
+from .catalog import Catalog
+from .compaction import CompactionScheduler
 from .core import (
+    add_column,
     create_table,
     delete,
+    drop_column,
     drop_table,
     info,
     insert,
     list_tables,
     select,
     update,
+    vacuum,
+)
+from .parser import (
+    parse_set_clause,
+    parse_value,
+    parse_values,
+    parse_where_clause,
 )
-from .parser import parse_set_clause, parse_values, parse_where_clause
-from .utils import load_metadata, save_metadata
 
 
 def print_help():
@@ -50,7 +59,19 @@ def print_help():
         "- создать таблицу"
     )
     print("<command> list_tables - показать список всех таблиц")
+    print(
+        "<command> vacuum <имя_таблицы> - сжать таблицу, вычистив "
+        "удаленные записи и столбцы"
+    )
     print("<command> drop_table <имя_таблицы> - удалить таблицу")
+    print(
+        "<command> alter_table <имя_таблицы> add <столбец:тип> "
+        "[default <значение>] - добавить столбец"
+    )
+    print(
+        "<command> alter_table <имя_таблицы> drop <столбец> "
+        "- удалить столбец"
+    )
     print("\nОбщие команды:")
     print("<command> exit - выход из программы")
     print("<command> help - справочная информация\n")
@@ -61,6 +82,12 @@ def run():
     print("***База данных***")
     print_help()
     
+    # Схемы таблиц читаются лениво, по одной при первом обращении
+    catalog = Catalog()
+    # Вычистка удаленных данных выполняется в фоновом потоке
+    scheduler = CompactionScheduler(catalog)
+    scheduler.start()
+    
     while True:
         try:
             user_input = prompt.string(">>>Введите команду: ")
@@ -71,6 +98,7 @@ def run():
             command = args[0].lower()
             
             if command == "exit":
+                scheduler.stop()
                 break
             elif command == "help":
                 print_help()
@@ -85,13 +113,10 @@ def run():
                     )
                     continue
                 
-                metadata = load_metadata()
-                metadata = create_table(metadata, args[1], args[2:])
-                save_metadata(metadata)
+                create_table(catalog, args[1], args[2:])
                 
             elif command == "list_tables":
-                metadata = load_metadata()
-                list_tables(metadata)
+                list_tables(catalog)
                 
             elif command == "drop_table":
                 if len(args) < 2:
@@ -101,9 +126,25 @@ def run():
                     )
                     continue
                 
-                metadata = load_metadata()
-                metadata = drop_table(metadata, args[1])
-                save_metadata(metadata)
+                drop_table(catalog, args[1])
+            
+            elif command == "alter_table":
+                action = args[2].lower() if len(args) > 2 else None
+                if action == "add" and len(args) in (4, 6) and (
+                    len(args) == 4 or args[4].lower() == "default"
+                ):
+                    default = parse_value(args[5]) if len(args) == 6 else None
+                    add_column(catalog, args[1], args[3], default)
+                elif action == "drop" and len(args) == 4:
+                    drop_column(catalog, args[1], args[3])
+                    scheduler.notify(args[1])
+                else:
+                    print(
+                        "Ошибка: Некорректный формат. "
+                        "Используйте: alter_table <таблица> add "
+                        "<столбец:тип> [default <значение>] или "
+                        "alter_table <таблица> drop <столбец>"
+                    )
             
             # CRUD операции
             elif command == "insert":
@@ -122,8 +163,7 @@ def run():
                 
                 try:
                     values = parse_values(values_str)
-                    metadata = load_metadata()
-                    insert(metadata, table_name, values)
+                    insert(catalog, table_name, values)
                 except Exception as e:
                     print(f"Ошибка: {e}")
             
@@ -147,8 +187,7 @@ def run():
                         continue
     
                 try:
-                    metadata = load_metadata()
-                    select(metadata, table_name, where_clause)
+                    select(catalog, table_name, where_clause)
                 except Exception as e:
                     print(f"Ошибка: {e}")
             
@@ -178,8 +217,7 @@ def run():
                     set_clause = parse_set_clause(set_str)
                     where_clause = parse_where_clause(where_str)
                     
-                    metadata = load_metadata()
-                    update(metadata, table_name, set_clause, where_clause)
+                    update(catalog, table_name, set_clause, where_clause)
                 except Exception as e:
                     print(f"Ошибка: {e}")
             
@@ -199,11 +237,21 @@ def run():
                 
                 try:
                     where_clause = parse_where_clause(where_str)
-                    metadata = load_metadata()
-                    delete(metadata, table_name, where_clause)
+                    delete(catalog, table_name, where_clause)
+                    scheduler.notify(table_name)
                 except Exception as e:
                     print(f"Ошибка: {e}")
             
+            elif command == "vacuum":
+                if len(args) < 2:
+                    print(
+                        "Ошибка: Недостаточно аргументов. "
+                        "Используйте: vacuum <имя_таблицы>"
+                    )
+                    continue
+                
+                vacuum(catalog, args[1])
+            
             elif command == "info":
                 if len(args) < 2:
                     print(
@@ -213,8 +261,7 @@ def run():
                     continue
                 
                 try:
-                    metadata = load_metadata()
-                    info(metadata, args[1])
+                    info(catalog, args[1])
                 except Exception as e:
                     print(f"Ошибка: {e}")
                 
@@ -2,9 +2,17 @@
 
 import json
 import os
+import shutil
+import threading
+from collections import defaultdict
 
 from .constants import DATA_DIR, META_FILE
 
+# Блокировки и счетчики перезаписей файлов данных по таблицам: нужны,
+# чтобы фоновое сжатие не затерло изменения основного потока
+_table_locks = defaultdict(threading.RLock)
+_table_generations = defaultdict(int)
+
 
 def load_metadata(filepath=META_FILE):
     """Загружает метаданные из JSON-файла"""
@@ -15,12 +23,6 @@ def load_metadata(filepath=META_FILE):
         return {}
 
 
-def save_metadata(data, filepath=META_FILE):
-    """Сохраняет метаданные в JSON-файл"""
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-
 def ensure_data_dir():
     """Создает директорию data если она не существует"""
     if not os.path.exists(DATA_DIR):
@@ -42,5 +44,106 @@ def save_table_data(table_name, data):
     """Сохраняет данные таблицы в JSON-файл"""
     ensure_data_dir()
     filepath = f"{DATA_DIR}/{table_name}.json"
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
\ No newline at end of file
+    tmp_path = f"{filepath}.tmp"
+    with table_lock(table_name):
+        # Файл подменяется целиком, чтобы фоновый поток не прочитал
+        # недописанные данные
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, filepath)
+        _table_generations[table_name] += 1
+
+
+def table_lock(table_name):
+    """Возвращает блокировку файлов таблицы"""
+    return _table_locks[table_name]
+
+
+def table_generation(table_name):
+    """Возвращает номер последней перезаписи файла данных таблицы"""
+    return _table_generations[table_name]
+
+
+def list_tombstoned_tables():
+    """Возвращает имена таблиц, у которых есть невычищенные записи"""
+    if not os.path.exists(DATA_DIR):
+        return []
+    suffix = ".tombstones.json"
+    return [
+        filename[:-len(suffix)]
+        for filename in os.listdir(DATA_DIR)
+        if filename.endswith(suffix)
+    ]
+
+
+def _load_tombstone_file(table_name):
+    filepath = f"{DATA_DIR}/{table_name}.tombstones.json"
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'rows': 0, 'ids': []}
+
+
+def load_tombstones(table_name):
+    """Загружает ID удаленных, но еще не вычищенных записей"""
+    return set(_load_tombstone_file(table_name)['ids'])
+
+
+def load_garbage_stats(table_name):
+    """Возвращает число записей в файле данных и число удаленных из них.
+
+    Читается только файл меток, поэтому проверка не зависит от размера
+    таблицы.
+    """
+    data = _load_tombstone_file(table_name)
+    return data['rows'], len(data['ids'])
+
+
+def save_tombstones(table_name, tombstones, row_count=0):
+    """Сохраняет ID удаленных записей и число записей в файле данных.
+
+    Пустой набор удаляет файл меток.
+    """
+    ensure_data_dir()
+    filepath = f"{DATA_DIR}/{table_name}.tombstones.json"
+    if not tombstones:
+        if os.path.exists(filepath):
+            os.remove(filepath)
+        return
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'rows': row_count, 'ids': sorted(tombstones)}, f)
+    os.replace(tmp_path, filepath)
+
+
+def table_data_path(table_name):
+    """Возвращает путь к файлу данных таблицы"""
+    return f"{DATA_DIR}/{table_name}.json"
+
+
+def columns_dir(table_name):
+    """Возвращает путь к колоночному хранилищу таблицы"""
+    return f"{DATA_DIR}/{table_name}.columns"
+
+
+def remove_table_data(table_name):
+    """Удаляет файл данных таблицы вместе с метками удаленных записей
+    и колоночным хранилищем"""
+    filepath = f"{DATA_DIR}/{table_name}.json"
+    with table_lock(table_name):
+        if os.path.exists(filepath):
+            os.remove(filepath)
+        if os.path.exists(columns_dir(table_name)):
+            shutil.rmtree(columns_dir(table_name))
+        save_tombstones(table_name, set())
+        # Сжатие, начатое до удаления, увидит новую перезапись и отменится
+        _table_generations[table_name] += 1
+
+
+def swap_table_data(table_name, tmp_path):
+    """Атомарно подменяет файл данных таблицы подготовленным файлом"""
+    filepath = f"{DATA_DIR}/{table_name}.json"
+    with table_lock(table_name):
+        os.replace(tmp_path, filepath)
+        _table_generations[table_name] += 1
@@ -0,0 +1,322 @@
+"""Векторизованное выполнение WHERE на NumPy, если он установлен.
+
+Для таблицы рядом с файлом данных строится колоночное хранилище:
+int и bool столбцы лежат массивами, строки - массивами номеров в
+словаре значений. Хранилище строится один раз из JSON-файла и
+перестраивается, только когда файл данных перезаписан. Массивы
+открываются через mmap и не держатся в памяти процесса, а словари
+записей собираются только для подходящих строк.
+"""
+
+import json
+import operator
+import os
+import shutil
+
+from .utils import (
+    columns_dir,
+    load_table_data,
+    load_tombstones,
+    table_data_path,
+    table_lock,
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NUMPY_AVAILABLE = np is not None
+
+_COMPARISONS = {
+    '>': operator.gt,
+    '<': operator.lt,
+    '>=': operator.ge,
+    '<=': operator.le,
+}
+_INT64_MIN = -2 ** 63
+_INT64_MAX = 2 ** 63 - 1
+_TYPES = {'int': int, 'bool': bool, 'str': str}
+# Во сколько раз массив строк фиксированной ширины может превышать
+# суммарную длину строк; иначе столбец не переводится в массив
+_MAX_WORDS_OVERHEAD = 4
+
+
+class _ColumnView:
+    """Столбец в виде массивов: значения, признак наличия и словарь строк"""
+
+    def __init__(self, values, present=None, words=None):
+        self.values = values
+        # None означает, что значение есть во всех записях
+        self.present = present
+        self.words = words
+
+
+class ColumnStore:
+    """Колоночное хранилище таблицы, открытое через mmap"""
+
+    def __init__(self, path, manifest):
+        self.path = path
+        self.row_count = manifest['rows']
+        self._columns = manifest['columns']
+
+    @classmethod
+    def open(cls, schema):
+        """Открывает хранилище, при необходимости перестраивая его"""
+        path = columns_dir(schema.name)
+        manifest = _read_manifest(path)
+        if manifest is None or manifest['source'] != _source_token(schema.name):
+            manifest = _build_store(schema, path)
+        if manifest is None:
+            return None
+        return cls(path, manifest)
+
+    def _load(self, filename):
+        return np.load(os.path.join(self.path, filename), mmap_mode='r')
+
+    def view(self, column):
+        """Возвращает столбец с подставленным значением по умолчанию.
+
+        None означает, что значения столбца не приводятся к его типу.
+        """
+        stored = self._columns.get(column.name)
+        if stored is None:
+            # Столбец добавлен после построения хранилища: в файле данных
+            # его значений нет ни в одной записи
+            dtype = bool if column.type == 'bool' else np.int64
+            values = np.zeros(self.row_count, dtype=dtype)
+            present = np.zeros(self.row_count, dtype=bool)
+            words = np.array([], dtype=str) if column.type == 'str' else None
+        elif stored['type'] != column.type:
+            return None
+        else:
+            values = self._load(stored['values'])
+            present = None
+            if 'present' in stored:
+                present = self._load(stored['present'])
+            words = None
+            if column.type == 'str':
+                words = self._load(stored['words'])
+
+        if present is None or column.default is None:
+            return _ColumnView(values, present, words)
+
+        # Отсутствующие значения заменяются значением по умолчанию,
+        # как это делает TableSchema.materialize
+        default = column.default
+        if column.type == 'str':
+            found = np.flatnonzero(words == default)
+            if len(found):
+                default = found[0]
+            else:
+                words = np.append(words, default)
+                default = len(words) - 1
+        return _ColumnView(np.where(present, values, default), None, words)
+
+    def live_mask(self, tombstones):
+        """Маска записей, не помеченных удаленными"""
+        if not tombstones:
+            return np.ones(self.row_count, dtype=bool)
+        ids = self._load(self._columns['ID']['values'])
+        return ~np.isin(ids, np.fromiter(tombstones, dtype=np.int64))
+
+
+def select_rows(schema, where_clause):
+    """Выбирает живые записи по условию WHERE.
+
+    Возвращает None, если NumPy не установлен или условие нельзя
+    вычислить векторно: тогда нужен обычный построчный проход.
+    """
+    if not NUMPY_AVAILABLE:
+        return None
+    column = schema.column(where_clause['column'])
+    if column is None or not _is_vectorizable(column, where_clause):
+        return None
+
+    # Метки удаленных записей должны соответствовать тому же файлу,
+    # по которому построено хранилище
+    with table_lock(schema.name):
+        store = ColumnStore.open(schema)
+        tombstones = load_tombstones(schema.name)
+    if store is None:
+        return None
+
+    views = {col.name: store.view(col) for col in schema.columns}
+    if any(view is None for view in views.values()):
+        return None
+    live = store.live_mask(tombstones)
+    if not live.any():
+        # Пустую таблицу обрабатывает обычный путь
+        return None
+
+    mask = _mask(views[column.name], where_clause) & live
+    return _materialize(schema, views, np.flatnonzero(mask))
+
+
+def _materialize(schema, views, indices):
+    """Собирает словари записей только для выбранных строк"""
+    records = [{} for _ in range(len(indices))]
+    for column in schema.columns:
+        view = views[column.name]
+        if view.words is not None and not len(view.words):
+            # Столбец не заполнен ни в одной записи
+            continue
+        values = view.values[indices]
+        if view.words is not None:
+            values = view.words[np.maximum(values, 0)]
+        values = values.tolist()
+
+        name = column.name
+        if view.present is None:
+            for record, value in zip(records, values):
+                record[name] = value
+        else:
+            present = view.present[indices].tolist()
+            for record, value, has_value in zip(records, values, present):
+                if has_value:
+                    record[name] = value
+    return records
+
+
+def _is_vectorizable(column, where_clause):
+    op = where_clause['operator']
+    if op in ('=', '!='):
+        return True
+    if op not in _COMPARISONS or column.type == 'str':
+        return False
+    try:
+        float(where_clause['value'])
+    except (ValueError, TypeError):
+        return False
+    return True
+
+
+def _mask(view, where_clause):
+    # Семантика совпадает с parser.apply_where_condition:
+    # = и != сравнивают строковые представления, остальные
+    # операторы сравнивают числа
+    op = where_clause['operator']
+    value = where_clause['value']
+    if op in ('=', '!='):
+        equal = _equal_mask(view, str(value))
+        matched = equal if op == '=' else ~equal
+    else:
+        compare = _COMPARISONS[op]
+        matched = compare(view.values.astype(np.float64), float(value))
+    if view.present is not None:
+        matched &= view.present
+    return matched
+
+
+def _equal_mask(view, text):
+    nothing = np.zeros(len(view.values), dtype=bool)
+    if view.words is not None:
+        found = np.flatnonzero(view.words == text)
+        return view.values == found[0] if len(found) else nothing
+
+    if view.values.dtype == bool:
+        if text == 'True':
+            return np.array(view.values)
+        if text == 'False':
+            return ~view.values
+        return nothing
+
+    try:
+        target = int(text)
+    except ValueError:
+        return nothing
+    if str(target) != text or not _INT64_MIN <= target <= _INT64_MAX:
+        return nothing
+    return view.values == target
+
+
+def _source_token(table_name):
+    """Определяет версию файла данных: он всегда подменяется целиком"""
+    try:
+        stat = os.stat(table_data_path(table_name))
+    except FileNotFoundError:
+        return None
+    return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+
+def _read_manifest(path):
+    try:
+        with open(os.path.join(path, "manifest.json"), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _build_store(schema, path):
+    """Строит хранилище по файлу данных и возвращает его описание"""
+    source = _source_token(schema.name)
+    if source is None:
+        return None
+    records = load_table_data(schema.name)
+
+    tmp_path = f"{path}.building"
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+    os.makedirs(tmp_path)
+
+    manifest = {'source': source, 'rows': len(records), 'columns': {}}
+    for column in schema.columns:
+        manifest['columns'][column.name] = _write_column(
+            tmp_path, column, records
+        )
+
+    with open(os.path.join(tmp_path, "manifest.json"), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.rename(tmp_path, path)
+    return manifest
+
+
+def _write_column(path, column, records):
+    """Сохраняет столбец в массивы и возвращает его описание"""
+    name = column.name
+    position = column.position
+    values = [record.get(name) for record in records]
+    expected_type = _TYPES[column.type]
+    if any(
+        value is not None and type(value) is not expected_type
+        for value in values
+    ):
+        # Данные не соответствуют схеме, остается построчный проход
+        return {'type': None}
+
+    stored = {'type': column.type, 'values': f"c{position}.npy"}
+    present = [value is not None for value in values]
+    if not all(present):
+        stored['present'] = f"c{position}.present.npy"
+        np.save(os.path.join(path, stored['present']), np.array(present))
+
+    if column.type == 'str':
+        # Строки кодируются номерами в словаре значений
+        words = {}
+        codes = [
+            -1 if value is None else words.setdefault(value, len(words))
+            for value in values
+        ]
+        max_length = max((len(word) for word in words), default=0)
+        total_length = sum(len(word) for word in words)
+        if (max_length * len(words)
+                > _MAX_WORDS_OVERHEAD * total_length + 1024
+                or any(word.endswith('\x00') for word in words)):
+            return {'type': None}
+        stored['words'] = f"c{position}.words.npy"
+        words_array = np.array(list(words), dtype=f"<U{max(max_length, 1)}")
+        np.save(os.path.join(path, stored['words']), words_array)
+        array = np.array(codes, dtype=np.int64)
+    else:
+        fill = 0 if column.type == 'int' else False
+        try:
+            array = np.array(
+                [fill if value is None else value for value in values],
+                dtype=np.int64 if column.type == 'int' else bool,
+            )
+        except OverflowError:
+            return {'type': None}
+    np.save(os.path.join(path, stored['values']), array)
+    return stored